@@ -50,8 +50,9 @@ class StepStatesWalkers(StatesWalkers):
          ``init_action`` and ``init_dts``.
         """
         clone, compas = super(StepStatesWalkers, self).clone(**kwargs)
-        self.init_actions[clone] = copy.deepcopy(self.init_actions[compas][clone])
-        self.init_dts[clone] = copy.deepcopy(self.init_dts[compas][clone])
+        clone_compas = compas[clone]
+        self.init_actions[clone] = self.init_actions[clone_compas]
+        self.init_dts[clone] = self.init_dts[clone_compas]
         return clone, compas
 
     def reset(self):
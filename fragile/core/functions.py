@@ -25,8 +25,8 @@ def get_alives_indexes(oobs: numpy.ndarray):
     """Get indexes representing random alive walkers given a vector of death conditions."""
     if numpy.all(oobs):
         return numpy.arange(len(oobs))
-    ix = numpy.logical_not(oobs).flatten()
-    return numpy.random.choice(numpy.arange(len(ix))[ix], size=len(ix), replace=ix.sum() < len(ix))
+    alive_ix = numpy.flatnonzero(numpy.logical_not(oobs))
+    return numpy.random.choice(alive_ix, size=oobs.size, replace=len(alive_ix) < oobs.size)
 
 
 def calculate_virtual_reward(
@@ -1,6 +1,8 @@
 import copy
-from typing import Dict, Generator, Iterable, List, Optional, Set, Tuple, Union
+import itertools
+from typing import Any, Dict, Generator, Iterable, List, Optional, Set, Tuple, Union
 
+from numba import jit
 import numpy
 
 from fragile.core.utils import (
@@ -8,10 +10,84 @@ from fragile.core.utils import (
     hash_numpy,
     hash_type,
     Scalar,
-    similiar_chunks_indexes,
     StateDict,
 )
 
+# Dtypes that can be cloned using the compiled kernel. Numba does not support float16,
+# extended precision or non-native byte orders, so those arrays are cloned with numpy.
+_JIT_CLONE_DTYPES = frozenset(
+    numpy.dtype(dtype)
+    for dtype in (
+        numpy.bool_,
+        numpy.int8,
+        numpy.int16,
+        numpy.int32,
+        numpy.int64,
+        numpy.uint8,
+        numpy.uint16,
+        numpy.uint32,
+        numpy.uint64,
+        numpy.float32,
+        numpy.float64,
+        numpy.complex64,
+        numpy.complex128,
+    )
+)
+# Below this number of walkers numpy.flatnonzero is faster than scanning the packed bitmask.
+_BITMASK_CLONE_MIN_WALKERS = 8192
+# De Bruijn sequence used to find the index of the lowest set bit of a 64 bits word.
+_DEBRUIJN_64 = numpy.uint64(0x03F79D71B4CB0A89)
+_DEBRUIJN_TABLE = numpy.zeros(64, dtype=numpy.int64)
+_DEBRUIJN_TABLE[[(((1 << bit) * int(_DEBRUIJN_64)) % 2 ** 64) >> 58 for bit in range(64)]] = (
+    numpy.arange(64)
+)
+
+
+def _clone_iter_bits(will_clone: numpy.ndarray) -> numpy.ndarray:
+    """Pack a boolean mask in 64 bits words. Bit ``i`` of word ``j`` is the item ``64 * j + i``."""
+    packed = numpy.packbits(will_clone, bitorder="little")
+    padding = numpy.zeros(-len(packed) % 8, dtype=numpy.uint8)
+    words = numpy.concatenate((packed, padding)).view("<u8")
+    return words.astype(numpy.uint64, copy=False)
+
+
+@jit(nopython=True)
+def _set_bits_indexes(words: numpy.ndarray) -> numpy.ndarray:
+    """Return the indexes of the set bits of an array of packed 64 bits words."""
+    indexes = numpy.empty(len(words) * 64, dtype=numpy.int64)
+    n_set = 0
+    for i in range(len(words)):
+        word = words[i]
+        while word != 0:
+            lowest_bit = word & (~word + numpy.uint64(1))
+            bit_ix = _DEBRUIJN_TABLE[(lowest_bit * _DEBRUIJN_64) >> numpy.uint64(58)]
+            indexes[n_set] = i * 64 + bit_ix
+            n_set += 1
+            word &= word - numpy.uint64(1)
+    return indexes[:n_set]
+
+
+def _clone_indexes(will_clone: numpy.ndarray) -> numpy.ndarray:
+    """Return the indexes of the walkers that will clone."""
+    if len(will_clone) < _BITMASK_CLONE_MIN_WALKERS:
+        return numpy.flatnonzero(will_clone)
+    return _set_bits_indexes(_clone_iter_bits(will_clone))
+
+
+@jit(nopython=True)
+def _clone_rows(data: numpy.ndarray, clone_ix: numpy.ndarray, clone_compas: numpy.ndarray):
+    """
+    Copy in place the rows ``clone_ix`` of ``data`` from the rows ``clone_compas``.
+
+    All the companion rows are read before writing, so companions that also \
+    clone are copied with their old values.
+    """
+    sources = numpy.empty((len(clone_ix), data.shape[1]), dtype=data.dtype)
+    for i in range(len(clone_ix)):
+        sources[i] = data[clone_compas[i]]
+    for i in range(len(clone_ix)):
+        data[clone_ix[i]] = sources[i]
+
 
 class States:
     """
@@ -57,13 +133,44 @@ class States:
              **kwargs: The name-tensor pairs can also be specified as kwargs.
 
         """
+        if state_dict is not None:
+            # Only allocate the arrays that will not be overridden by the provided data.
+            state_dict = {k: v for k, v in state_dict.items() if k not in kwargs}
         attr_dict = self.params_to_arrays(state_dict, batch_size) if state_dict is not None else {}
-        attr_dict.update(kwargs)
-        self._names = list(attr_dict.keys())
-        self._attr_dict = attr_dict
-        self.update(**self._attr_dict)
+        attr_dict.update({name: self._copy_value(val) for name, val in kwargs.items()})
+        # Placeholder attributes defined by the subclasses would shadow the stored data.
+        for name in attr_dict:
+            self.__dict__.pop(name, None)
+        self._data = attr_dict
+        self._names = tuple(attr_dict)
+        self._items, self._vals = None, None
         self._batch_size = batch_size
 
+    @staticmethod
+    def _copy_value(value):
+        """Copy the provided value. Arrays that do not hold objects are stored in C order."""
+        if isinstance(value, numpy.ndarray) and value.dtype != object:
+            return numpy.array(value, order="C")
+        return copy.deepcopy(value)
+
+    def __getattr__(self, item: str):
+        """Access the stored data as if it was an attribute of the class."""
+        data = self.__dict__.get("_data")
+        if data is None or item not in data:
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(self.__class__.__name__, item)
+            )
+        return data[item]
+
+    def __setattr__(self, key: str, value):
+        """Write to the stored data when the attribute is already part of the :class:`States`."""
+        data = self.__dict__.get("_data")
+        if data is not None and key in data:
+            data[key] = value
+            self._items, self._vals = None, None
+        else:
+            super(States, self).__setattr__(key, value)
+
     def __len__(self):
         """Length is equal to n_walkers."""
         return self._batch_size
@@ -82,7 +189,9 @@ class States:
 
         """
         if isinstance(item, str):
-            try:
+            if item in self._data:
+                return self._data[item]
+            try:  # Attributes that are not part of the stored data
                 return getattr(self, item)
             except AttributeError:
                 raise TypeError("Tried to get a non existing attribute with key {}".format(item))
@@ -115,17 +224,18 @@ class States:
             None.
 
         """
-        if key not in self._names:
-            self._names.append(key)
+        if key not in self._data:
+            self.__dict__.pop(key, None)
+            self._data[key] = None
+            self._names = self._names + (key,)
         self.update(**{key: value})
 
     def __repr__(self):
-        string = "{} with {} walkers\n".format(self.__class__.__name__, self.n)
-        for k, v in self.items():
-            shape = v.shape if hasattr(v, "shape") else None
-            new_str = "{}: {} {}\n".format(k, type(v), shape)
-            string += new_str
-        return string
+        lines = ["{} with {} walkers\n".format(self.__class__.__name__, self.n)]
+        lines.extend(
+            "{}: {} {}\n".format(k, type(v), getattr(v, "shape", None)) for k, v in self.items()
+        )
+        return "".join(lines)
 
     def __hash__(self) -> int:
         _hash = hash(
@@ -163,51 +273,36 @@ class States:
 
         """
 
+        def as_walkers_array(data, state_len, name):
+            # Add the walkers dimension to the data of single walker states if needed.
+            if len(data.shape) == 0 and state_len == 1:
+                # Name is scalar vector. Data is scalar value. Transform to array first
+                return data.reshape(1)
+            elif len(data.shape) == 1 and state_len == 1 and data.shape[0] != 1:
+                # Name is a matrix of vectors. Data needs an additional dimension
+                return data[numpy.newaxis]
+            elif len(data.shape) > 0:
+                # Data already has the walkers dimension.
+                return data
+            raise ValueError(
+                "Could not infer data concatenation for attribute %s  with shape %s"
+                % (name, data.shape)
+            )
+
         def merge_one_name(states_list, name):
             vals = []
-            is_scalar_vector = True
             for state in states_list:
                 data = state[name]
                 # Attributes that are not numpy arrays are not stacked.
                 if not isinstance(data, numpy.ndarray):
                     return data
-                state_len = len(state)
-                if len(data.shape) == 0 and state_len == 1:
-                    # Name is scalar vector. Data is scalar value. Transform to array first
-                    value = numpy.array([data]).flatten()
-                elif len(data.shape) == 1 and state_len == 1:
-                    if data.shape[0] == 1:
-                        # Name is scalar vector. Data already transformed to an array
-                        value = data
-                    else:
-                        # Name is a matrix of vectors. Data needs an additional dimension
-                        is_scalar_vector = False
-                        value = numpy.array([data])
-                elif len(data.shape) == 1 and state_len > 1:
-                    # Name is a scalar vector. Data already has is a one dimensional array
-                    value = data
-                elif (
-                    len(data.shape) > 1
-                    and state_len > 1
-                    or len(data.shape) > 1
-                    and len(state) == 1
-                ):
-                    # Name is a matrix of vectors. Data has the correct shape
-                    is_scalar_vector = False
-                    value = data
-                else:
-                    raise ValueError(
-                        "Could not infer data concatenation for attribute %s  with shape %s"
-                        % (name, data.shape)
-                    )
-                vals.append(value)
-            if is_scalar_vector:
-                return numpy.concatenate(vals)
-            else:
-                return numpy.vstack(vals)
+                vals.append(as_walkers_array(data, len(state), name))
+            # Single walker chunks already have a walkers dimension, so one concatenate
+            # also covers them. Stacking them separately is slower.
+            return numpy.concatenate(vals, axis=0)
 
         # Assumes all states have the same names.
-        data = {name: merge_one_name(states, name) for name in states[0]._names}
+        data = {name: merge_one_name(states, name) for name in states[0].keys()}
         batch_size = sum(s.n for s in states)
         return states[0].__class__(batch_size=batch_size, **data)
 
@@ -229,21 +324,32 @@ class States:
              default value.
 
         """
-        if key not in self.keys():
+        if key not in self._data:
             return default
         return self[key]
 
-    def keys(self) -> Generator:
-        """Return a generator for the attribute names of the stored data."""
-        return (name for name in self._names if not name.startswith("_"))
-
-    def vals(self) -> Generator:
-        """Return a generator for the values of the stored data."""
-        return (self[name] for name in self._names if not name.startswith("_"))
-
-    def items(self) -> Generator:
-        """Return a generator for the attribute names and the values of the stored data."""
-        return ((name, self[name]) for name in self._names if not name.startswith("_"))
+    def keys(self) -> Tuple[str, ...]:
+        """Return a tuple containing the attribute names of the stored data."""
+        return self._names
+
+    def vals(self) -> Tuple:
+        """Return a tuple containing the values of the stored data."""
+        if self._vals is None:
+            self._vals = tuple(self._data.values())
+        return self._vals
+
+    def items(self) -> Tuple[Tuple[str, Any], ...]:
+        """Return a tuple containing the attribute names and the values of the stored data."""
+        if self._items is None:
+            self._items = tuple(self._data.items())
+        return self._items
+
+    def _walkers_columns(self) -> Tuple[Iterable, ...]:
+        """Return the stored values as columns that can be iterated by walker."""
+        return tuple(
+            v if isinstance(v, numpy.ndarray) else itertools.repeat(v, self.n)
+            for v in self.vals()
+        )
 
     def itervals(self):
         """
@@ -254,10 +360,7 @@ class States:
             correspond to a given walker.
 
         """
-        if self.n <= 1:
-            return self.vals()
-        for i in range(self.n):
-            yield tuple([v[i] for v in self.vals()])
+        return zip(*self._walkers_columns())
 
     def iteritems(self):
         """
@@ -268,34 +371,29 @@ class States:
             correspond to a given walker.
 
         """
-        if self.n < 1:
-            return self.vals()
-        for i in range(self.n):
-            values = (v[i] if isinstance(v, numpy.ndarray) else v for v in self.vals())
-            yield tuple(self._names), tuple(values)
+        names = self.keys()
+        return zip(itertools.repeat(names, self.n), self.itervals())
+
+    def iter_chunks(self, chunk_size: int = 256) -> Generator["States", None, None]:
+        """
+        Return a generator of :class:`States` containing the data of at most \
+        ``chunk_size`` consecutive walkers.
+        """
+        items = tuple(self.items())
+        for start in range(0, self.n, chunk_size):
+            end = min(start + chunk_size, self.n)
+            # The slices are views of this instance's buffers. __init__ copies them, so
+            # each chunk owns its memory and pickling it does not serialize the full arrays.
+            data = {k: v[start:end] if isinstance(v, numpy.ndarray) else v for k, v in items}
+            yield self.__class__(batch_size=end - start, **data)
 
     def split_states(self, n_chunks: int) -> Generator["States", None, None]:
         """
         Return a generator for n_chunks different states, where each one \
         contain only the data corresponding to one walker.
         """
-
-        def get_chunck_size(state, start, end):
-            for name in state._names:
-                attr = state[name]
-                if isinstance(attr, numpy.ndarray):
-                    return len(attr[start:end])
-            return int(numpy.ceil(self.n / n_chunks))
-
-        for start, end in similiar_chunks_indexes(self.n, n_chunks):
-            chunk_size = get_chunck_size(self, start, end)
-
-            data = {
-                k: val[start:end] if isinstance(val, numpy.ndarray) else val
-                for k, val in self.items()
-            }
-            new_state = self.__class__(batch_size=chunk_size, **data)
-            yield new_state
+        chunk_size = int(numpy.ceil(self.n / n_chunks))
+        return self.iter_chunks(max(chunk_size, 1))
 
     def update(self, other: "States" = None, **kwargs):
         """
@@ -313,7 +411,12 @@ class States:
         def update_or_set_attributes(attrs: Union[dict, States]):
             for name, val in attrs.items():
                 try:
-                    getattr(self, name)[:] = copy.deepcopy(val)
+                    target = getattr(self, name)
+                    if isinstance(target, numpy.ndarray) and target.dtype != object:
+                        # Slice assignment already copies the data into the existing array.
+                        target[:] = val
+                    else:
+                        target[:] = copy.deepcopy(val)
                 except (AttributeError, TypeError, KeyError, ValueError):
                     setattr(self, name, copy.deepcopy(val))
 
@@ -341,15 +444,42 @@ class States:
 
         """
         ignore = set() if ignore is None else ignore
-        for name in self.keys():
-            if isinstance(self[name], numpy.ndarray) and name not in ignore:
-                self[name][will_clone] = self[name][compas_ix][will_clone]
+        clone_ix = _clone_indexes(will_clone)
+        if len(clone_ix) == 0:
+            return
+        clone_compas = compas_ix[clone_ix]
+        walkers_rows = self._walkers_rows()
+        for name, val in self.items():
+            if not isinstance(val, numpy.ndarray) or name in ignore:
+                continue
+            if name in walkers_rows:
+                _clone_rows(walkers_rows[name], clone_ix, clone_compas)
+            else:
+                val[clone_ix] = val[clone_compas]
+
+    def _walkers_rows(self) -> Dict[str, numpy.ndarray]:
+        """
+        Return ``(n_walkers, -1)`` views of the numeric arrays that store one row per walker.
+
+        The views share memory with the stored data, so writing to them \
+        modifies the :class:`States` in place.
+        """
+        return {
+            name: val.reshape(self.n, int(numpy.prod(val.shape[1:])))
+            for name, val in self.items()
+            if isinstance(val, numpy.ndarray)
+            and val.dtype in _JIT_CLONE_DTYPES
+            and val.ndim > 0
+            and val.shape[0] == self.n
+            and val.flags.c_contiguous
+        }
 
     def get_params_dict(self) -> StateDict:
         """Return a dictionary describing the data stored in the :class:`States`."""
+        attrs = itertools.chain(self.__dict__.items(), self.__dict__.get("_data", {}).items())
         return {
             k: {"shape": v.shape, "dtype": v.dtype}
-            for k, v in self.__dict__.items()
+            for k, v in attrs
             if isinstance(v, numpy.ndarray)
         }
 
@@ -358,6 +488,47 @@ class States:
         param_dict = {str(name): val.copy() for name, val in self.items()}
         return States(batch_size=self.n, **param_dict)
 
+    def to_structured(self) -> numpy.ndarray:
+        """
+        Pack the data of the walkers in a single numpy structured array.
+
+        Each field of the returned array contains one of the attributes that \
+        store an array with one row per walker. All the data lives in a single \
+        contiguous buffer, so it can be serialized as one block. Attributes \
+        that are not arrays are not included.
+
+        Returns:
+            Structured array of shape (n_walkers,) with one field per attribute.
+
+        """
+        fields = [
+            (name, val)
+            for name, val in self.items()
+            if isinstance(val, numpy.ndarray) and val.ndim > 0 and val.shape[0] == self.n
+        ]
+        dtype = numpy.dtype([(name, val.dtype, val.shape[1:]) for name, val in fields])
+        structured = numpy.empty(self.n, dtype=dtype)
+        for name, val in fields:
+            structured[name] = val
+        return structured
+
+    @classmethod
+    def from_structured(cls, structured: numpy.ndarray, **kwargs) -> "States":
+        """
+        Create a new instance from a structured array created with :meth:`to_structured`.
+
+        Args:
+            structured: Structured array containing one field per attribute.
+            **kwargs: Additional attributes of the new instance.
+
+        Returns:
+            New instance containing the data of ``structured``.
+
+        """
+        data = {name: structured[name] for name in structured.dtype.names}
+        data.update(kwargs)
+        return cls(batch_size=len(structured), **data)
+
     @staticmethod
     def params_to_arrays(param_dict: StateDict, n_walkers: int) -> Dict[str, numpy.ndarray]:
         """
@@ -384,11 +555,9 @@ class States:
                 val_size = val.get("size")
             # Create appropriate shapes with current state's number of walkers.
             sizes = n_walkers if val_size is None else tuple([n_walkers]) + val_size
-            if "size" in val:
-                del val["size"]
-            if "shape" in val:
-                del val["shape"]
-            tensor_dict[key] = numpy.zeros(shape=sizes, **val)
+            # Do not modify the provided param_dict, it can be reused by the caller.
+            array_kwargs = {k: v for k, v in val.items() if k not in {"size", "shape"}}
+            tensor_dict[key] = numpy.zeros(shape=sizes, **array_kwargs)
         return tensor_dict
 
 
@@ -518,6 +687,19 @@ class StatesWalkers(States):
 
     """
 
+    # Value of the attributes that are filled with a constant on reset. Their dtype
+    # is the one defined in get_params_dict.
+    RESET_VALUES = {
+        "id_walkers": "",
+        "processed_rewards": 0,
+        "cum_rewards": 0,
+        "virtual_rewards": 1,
+        "distances": 0,
+        "clone_probs": 0,
+        "will_clone": False,
+        "in_bounds": True,
+    }
+
     def __init__(self, batch_size: int, state_dict: Optional[StateDict] = None, **kwargs):
         """
         Initialize a :class:`StatesWalkers`.
@@ -570,8 +752,9 @@ class StatesWalkers(States):
     def clone(self, **kwargs) -> Tuple[numpy.ndarray, numpy.ndarray]:
         """Perform the clone only on cum_rewards and id_walkers and reset the other arrays."""
         clone, compas = self.will_clone, self.compas_clone
-        self.cum_rewards[clone] = copy.deepcopy(self.cum_rewards[compas][clone])
-        self.id_walkers[clone] = copy.deepcopy(self.id_walkers[compas][clone])
+        clone_compas = compas[clone]
+        self.cum_rewards[clone] = self.cum_rewards[clone_compas]
+        self.id_walkers[clone] = self.id_walkers[clone_compas]
         return clone, compas
 
     def reset(self):
@@ -580,18 +763,19 @@ class StatesWalkers(States):
         other_attrs = [name for name in self.keys() if name not in params]
         for attr in other_attrs:
             setattr(self, attr, None)
-        self.update(
-            id_walkers=numpy.zeros(self.n, dtype=hash_type),
-            compas_dist=numpy.arange(self.n),
-            compas_clone=numpy.arange(self.n),
-            processed_rewards=numpy.zeros(self.n, dtype=float_type),
-            cum_rewards=numpy.zeros(self.n, dtype=float_type),
-            virtual_rewards=numpy.ones(self.n, dtype=float_type),
-            distances=numpy.zeros(self.n, dtype=float_type),
-            clone_probs=numpy.zeros(self.n, dtype=float_type),
-            will_clone=numpy.zeros(self.n, dtype=numpy.bool_),
-            in_bounds=numpy.ones(self.n, dtype=numpy.bool_),
-        )
+        self.update(compas_dist=numpy.arange(self.n), compas_clone=numpy.arange(self.n))
+        for name, value in self.RESET_VALUES.items():
+            dtype = numpy.dtype(params[name]["dtype"])
+            target = self._data.get(name)
+            if (
+                isinstance(target, numpy.ndarray)
+                and target.shape == (self.n,)
+                and target.dtype == dtype
+            ):
+                # Reuse the existing buffer instead of allocating a new array.
+                target.fill(value)
+            else:
+                self.update(**{name: numpy.full(self.n, value, dtype=dtype)})
 
     def _ix(self, index: int):
         # TODO(guillemdb): Allow slicing
@@ -79,7 +79,9 @@ class SimpleWalkers(BaseWalkers):
         )
 
         def l2_norm(x: numpy.ndarray, y: numpy.ndarray) -> numpy.ndarray:
-            return numpy.sqrt(numpy.sum((x - y) ** 2, axis=1))
+            # Only the ordering of the distances matters, so they are computed in single precision.
+            diff = numpy.subtract(x, y, dtype=float_type)
+            return numpy.sqrt(numpy.square(diff, out=diff).sum(axis=1))
 
         self._model_states = StatesModel(state_dict=model_state_params, batch_size=n_walkers)
         self._env_states = StatesEnv(state_dict=env_state_params, batch_size=n_walkers)
@@ -229,7 +231,7 @@ class SimpleWalkers(BaseWalkers):
         """
         if not self.states.in_bounds.any():  # No need to sample if all walkers are dead.
             return numpy.arange(self.n)
-        alive_indexes = numpy.arange(self.n, dtype=int)[self.states.in_bounds]
+        alive_indexes = numpy.flatnonzero(self.states.in_bounds)
         compas_ix = self.random_state.permutation(alive_indexes)
         compas = self.random_state.choice(compas_ix, self.n, replace=True)
         compas[: len(compas_ix)] = compas_ix
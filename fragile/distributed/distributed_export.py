@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, List
 
 import numpy
 
@@ -11,6 +11,60 @@ from fragile.distributed.ray.export_swarm import (
 )
 
 
+class _ExchangeScheduler:
+    """
+    Keep track of the exchange steps running on several :class:`ExportSwarm`, \
+    so that every swarm runs exactly ``max_epochs`` iterations.
+    """
+
+    def __init__(self, swarms: List, max_epochs: int, steps_per_rpc: int):
+        """
+        Initialize a :class:`_ExchangeScheduler`.
+
+        Args:
+            swarms: Handles of the remote :class:`ExportSwarm`.
+            max_epochs: Number of iterations that each swarm will run.
+            steps_per_rpc: Maximum number of iterations run in each exchange step.
+
+        """
+        self.swarms = swarms
+        self.max_epochs = max_epochs
+        self.steps_per_rpc = steps_per_rpc
+        self.scheduled_steps = [0] * len(swarms)
+        self.finished_steps = [0] * len(swarms)
+        # Exchange steps in flight, and the swarm index and iterations of each one.
+        self.pending = {}
+
+    @property
+    def epoch(self) -> int:
+        """Return the mean number of iterations finished by each swarm."""
+        return sum(self.finished_steps) // len(self.swarms)
+
+    def submit(self, swarm_ix: int, import_walkers) -> None:
+        """
+        Start a new exchange step in the target swarm, unless it has already \
+        been scheduled ``max_epochs`` iterations.
+
+        The last exchange step of each swarm only runs the iterations left.
+        """
+        n_steps = min(self.steps_per_rpc, self.max_epochs - self.scheduled_steps[swarm_ix])
+        if n_steps > 0:
+            step = self.swarms[swarm_ix].run_exchange_step.remote(import_walkers, n_steps)
+            self.pending[step] = (swarm_ix, n_steps)
+            self.scheduled_steps[swarm_ix] += n_steps
+
+    def finish(self, step) -> int:
+        """Mark an exchange step as finished and return the index of its swarm."""
+        swarm_ix, n_steps = self.pending.pop(step)
+        self.finished_steps[swarm_ix] += n_steps
+        return swarm_ix
+
+    def report_due(self, last_epoch: int, report_interval) -> bool:
+        """Return ``True`` if the epoch crossed a multiple of ``report_interval`` \
+        since ``last_epoch``."""
+        return self.epoch // report_interval > last_epoch // report_interval
+
+
 class DistributedExport:
     """
     Run a search process that exchanges :class:`ExportSwarm`.
@@ -31,6 +85,7 @@ class DistributedExport:
         add_global_best: bool = True,
         swarm_kwargs: dict = None,
         report_interval: int = numpy.inf,
+        steps_per_rpc: int = 1,
     ):
         """
         Initialize a :class:`DistributedExport`.
@@ -55,9 +110,18 @@ class DistributedExport:
                              returns.
             swarm_kwargs: Dictionary containing keyword that will be passed to ``swarm``.
             report_interval: Display the algorithm progress every ``log_interval`` epochs.
+            steps_per_rpc: Number of iterations that each :class:`ExportSwarm` \
+                           runs between two walker exchanges. Higher values \
+                           reduce the number of remote calls, but the swarms \
+                           exchange walkers less often. The last call of each \
+                           swarm only runs the iterations left to reach \
+                           ``max_epochs``.
 
         """
+        if steps_per_rpc < 1:
+            raise ValueError("steps_per_rpc must be at least 1, got %s" % steps_per_rpc)
         self.report_interval = report_interval
+        self.steps_per_rpc = steps_per_rpc
         self.swarms = [
             RemoteExportSwarm.remote(
                 swarm=swarm,
@@ -112,23 +176,25 @@ class DistributedExport:
         report_interval = self.report_interval if report_interval is None else report_interval
         self.reset(root_walker=root_walker)
         current_import_walkers = self.swarms[0].get_empty_export_walkers.remote()
-        steps = {}
-        for swarm in self.swarms:
-            steps[swarm.run_exchange_step.remote(current_import_walkers)] = swarm
+        scheduler = _ExchangeScheduler(self.swarms, self.max_epochs, self.steps_per_rpc)
+        for swarm_ix in range(self.n_swarms):
+            scheduler.submit(swarm_ix, current_import_walkers)
 
-        for i in range(self.max_epochs * self.n_swarms):
-            self._epoch = i // self.n_swarms
-            ready_export_walkers, _ = ray.wait(list(steps))
+        i = 0
+        while scheduler.pending:
+            ready_export_walkers, _ = ray.wait(list(scheduler.pending))
             ready_export_walker_id = ready_export_walkers[0]
-            swarm = steps.pop(ready_export_walker_id)
+            swarm_ix = scheduler.finish(ready_export_walker_id)
+            last_epoch, self._epoch = self._epoch, scheduler.epoch
 
             # Compute and apply gradients.
             current_import_walkers = self.param_server.exchange_walkers.remote(
                 ready_export_walker_id
             )
-            steps[swarm.run_exchange_step.remote(current_import_walkers)] = swarm
+            scheduler.submit(swarm_ix, current_import_walkers)
 
-            if self.epoch % report_interval == 0 and self.epoch > 0:
+            if scheduler.report_due(last_epoch, report_interval):
                 # Evaluate the current model after every 10 updates.
                 best = self.get_best()
                 print("iter {} best_reward: {:.3f}".format(i, best.rewards))
+            i += 1
@@ -271,11 +271,7 @@ class _BatchEnv:
     def _merge_data(data_dicts: List[Dict[str, numpy.ndarray]]):
         def group_data(vals):
             try:
-                return (
-                    numpy.vstack(vals)
-                    if len(vals[0].shape) > 1
-                    else numpy.concatenate(vals).flatten()
-                )
+                return numpy.concatenate(vals, axis=0)
             except Exception:
                 raise ValueError("MIAU: %s %s" % (len(vals), vals[0].shape))
 
@@ -500,11 +496,7 @@ class RayEnv(EnvWrapper):
     def _merge_data(data_dicts: List[Dict[str, numpy.ndarray]]):
         def group_data(vals):
             try:
-                return (
-                    numpy.vstack(vals)
-                    if len(vals[0].shape) > 1
-                    else numpy.concatenate(vals).flatten()
-                )
+                return numpy.concatenate(vals, axis=0)
             except Exception:
                 raise ValueError("MIAU: %s %s" % (len(vals), vals[0].shape))
 
@@ -15,13 +15,14 @@ class ExportedWalkers(States):
     """Represents the walkers that are being passed across different instances \
     of :class:`ExportSwarm`."""
 
-    def __init__(self, batch_size: int, state_dict: StateDict = None):
+    def __init__(self, batch_size: int, state_dict: StateDict = None, **kwargs):
         """
         Initialize a :class:`ExportWalkers`.
 
         Args:
             batch_size: Number of walkers that will be exported.
             state_dict: External :class:`StateDict` that overrides the default values.
+            **kwargs: The name-tensor pairs can also be specified as kwargs.
 
         """
         self.id_walkers = None
@@ -35,7 +36,9 @@ class ExportedWalkers(States):
             for k, v in state_dict.items():
                 if k in walkers_dict:
                     walkers_dict[k] = v
-        super(ExportedWalkers, self).__init__(batch_size=batch_size, state_dict=walkers_dict)
+        super(ExportedWalkers, self).__init__(
+            batch_size=batch_size, state_dict=walkers_dict, **kwargs
+        )
 
     def get_params_dict(self) -> StateDict:
         """Return a dictionary containing the param_dict to build an instance \
@@ -150,7 +153,7 @@ class ExportSwarm(SwarmWrapper):
         self._import_best = import_best
         super(ExportSwarm, self).__init__(swarm, name="swarm")
 
-    def run_exchange_step(self, walkers: ExportedWalkers) -> ExportedWalkers:
+    def run_exchange_step(self, walkers: ExportedWalkers, n_steps: int = 1) -> ExportedWalkers:
         """
         Import the target :class:`ExportedWalkers` before iterating the wrapped \
         :class:`Swarm`, and export the target number of walkers as a \
@@ -159,13 +162,16 @@ class ExportSwarm(SwarmWrapper):
         Args:
             walkers: Walkers that will be imported after running an iteration \
             of the :class:`Swarm`.
+            n_steps: Number of iterations of the :class:`Swarm` that will be \
+                     run before exporting the walkers.
 
         Returns:
-            walkers exported after running an iteration of the :class:`Swarm`.
+            walkers exported after running ``n_steps`` iterations of the :class:`Swarm`.
 
         """
         self.import_walkers(walkers)
-        self.run_step()
+        for _ in range(n_steps):
+            self.run_step()
         return self.export_walkers()
 
     def export_walkers(self) -> ExportedWalkers:
@@ -288,19 +294,13 @@ class ExportSwarm(SwarmWrapper):
         walkers: ExportedWalkers,
     ) -> None:
         """Clone the :class:`Swarm` selected walkers to the target imported walkers."""
-        clone_ids = copy.deepcopy(walkers.id_walkers[import_ix][compas_ix][will_clone])
-        clone_rewards = copy.deepcopy(walkers.rewards[import_ix][compas_ix][will_clone])
-        clone_states = copy.deepcopy(walkers.states[import_ix][compas_ix][will_clone])
-        clone_obs = copy.deepcopy(walkers.observs[import_ix][compas_ix][will_clone])
-        # TODO: Find a better way to do this. Assignment does not work after double array indexing
-        i = 0
-        for (ix, wc) in zip(local_ix, will_clone):
-            if wc:
-                self.swarm.walkers.states.id_walkers[ix] = clone_ids[i]
-                self.swarm.walkers.states.cum_rewards[ix] = clone_rewards[i]
-                self.swarm.walkers.env_states.states[ix] = clone_states[i]
-                self.swarm.walkers.env_states.observs[ix] = clone_obs[i]
-                i += 1
+        # Compose the indexes to only gather the imported walkers that will be cloned.
+        source_ix = import_ix[compas_ix[will_clone]]
+        target_ix = local_ix[will_clone]
+        self.swarm.walkers.states.id_walkers[target_ix] = walkers.id_walkers[source_ix]
+        self.swarm.walkers.states.cum_rewards[target_ix] = walkers.rewards[source_ix]
+        self.swarm.walkers.env_states.states[target_ix] = walkers.states[source_ix]
+        self.swarm.walkers.env_states.observs[target_ix] = walkers.observs[source_ix]
 
     def _get_merge_indexes(self, walkers: ExportedWalkers) -> Tuple[numpy.ndarray, numpy.ndarray]:
         """Get the indexes for selecting the walkers that will be compared in \
@@ -72,9 +72,9 @@ class ExportSwarm:
         """
         return ExportedWalkers(0)
 
-    def run_exchange_step(self, walkers: ExportedWalkers) -> ExportedWalkers:
+    def run_exchange_step(self, walkers: ExportedWalkers, n_steps: int = 1) -> ExportedWalkers:
         """Run a the walkers import/export process of the internal :class:`ExportSwarm`."""
-        return self.swarm.run_exchange_step(walkers)
+        return self.swarm.run_exchange_step(walkers, n_steps=n_steps)
 
     def get(self, name: str):
         """Access attributes of the underlying :class:`ExportSwarm`."""
@@ -1,7 +1,16 @@
 import numpy
 import pytest  # noqa: F401
 
-from fragile.core.states import States, StatesEnv, StatesModel, StatesWalkers
+from fragile.core.states import (
+    _clone_indexes,
+    _clone_iter_bits,
+    _set_bits_indexes,
+    States,
+    StatesEnv,
+    StatesModel,
+    StatesWalkers,
+)
+from fragile.distributed.export_swarm import ExportedWalkers
 
 from tests.core.test_swarm import create_atari_swarm
 
@@ -41,6 +50,18 @@ class TestStates:
         assert new_states[name_1] == val_1, type(new_states)
         assert (new_states[name_2] == val_2).all(), type(new_states)
 
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_keys_vals_items_follow_updates(self, states_class):
+        new_states = states_class(batch_size=2, miau="miau")
+        assert new_states.items() is new_states.items()
+        new_states["elephant"] = numpy.arange(2)
+        new_states.miau = "guau"
+        assert new_states.keys()[-1] == "elephant"
+        items = dict(new_states.items())
+        assert items["miau"] == "guau"
+        assert (items["elephant"] == numpy.arange(2)).all()
+        assert tuple(items.values()) == new_states.vals()
+
     @pytest.mark.parametrize("states_class", state_classes)
     def test_repr(self, states_class):
         name = "miau"
@@ -94,6 +115,76 @@ class TestStates:
         assert split_states[-1].test == "test"
         assert (split_states[-1].data == numpy.arange(5)).all(), (s.data.shape, test_data.shape)
 
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_iter_chunks(self, states_class):
+        batch_size = 21
+        data = numpy.tile(numpy.arange(5), (batch_size, 1))
+        new_states = states_class(batch_size=batch_size, test="test", data=data)
+        chunks = list(new_states.iter_chunks(4))
+        assert [len(s) for s in chunks] == [4, 4, 4, 4, 4, 1]
+        for s in chunks:
+            assert s.test == "test"
+            assert s.data.shape == (len(s), 5)
+            assert (s.data == numpy.arange(5)).all()
+        assert len(list(new_states.iter_chunks())) == 1
+
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_split_states_own_data(self, states_class):
+        batch_size = 6
+        data = numpy.tile(numpy.arange(5), (batch_size, 1))
+        new_states = states_class(batch_size=batch_size, test="test", data=data)
+        for s in new_states.split_states(3):
+            for name, val in s.items():
+                if isinstance(val, numpy.ndarray):
+                    assert val.base is None, name
+                    assert val.flags.c_contiguous, name
+            s.data[:] = -1
+        assert (new_states.data == data).all()
+
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_iter_walkers(self, states_class):
+        batch_size = 7
+        data = numpy.tile(numpy.arange(5), (batch_size, 1))
+        new_states = states_class(batch_size=batch_size, test="test", data=data)
+        names = tuple(new_states.keys())
+        vals = list(new_states.itervals())
+        items = list(new_states.iteritems())
+        assert len(vals) == len(items) == batch_size
+        for (item_names, item_vals), walker_vals in zip(items, vals):
+            assert item_names == names
+            assert len(walker_vals) == len(names)
+            walker_data = dict(zip(names, walker_vals))
+            assert walker_data["test"] == "test"
+            assert (walker_data["data"] == numpy.arange(5)).all()
+
+    @pytest.mark.parametrize("states_class", state_classes + [ExportedWalkers])
+    def test_structured(self, states_class):
+        batch_size = 7
+        data = numpy.arange(batch_size * 6, dtype=numpy.float32).reshape(batch_size, 2, 3)
+        ids = numpy.array([str(i) for i in range(batch_size)])
+        new_states = states_class(batch_size=batch_size, test="test", data=data, ids=ids)
+        structured = new_states.to_structured()
+        assert structured.shape == (batch_size,)
+        assert "test" not in structured.dtype.names
+        rebuilt = states_class.from_structured(structured, test="test")
+        assert len(rebuilt) == batch_size
+        assert rebuilt.test == "test"
+        for name in new_states.keys():
+            if isinstance(new_states[name], numpy.ndarray):
+                assert rebuilt[name].shape == new_states[name].shape
+                assert rebuilt[name].dtype == new_states[name].dtype
+                assert (rebuilt[name] == new_states[name]).all()
+
+    def test_structured_exported_walkers(self):
+        walkers = ExportedWalkers(3)
+        walkers.update(rewards=numpy.arange(3), id_walkers=numpy.arange(3) + 2 ** 40)
+        rebuilt = ExportedWalkers.from_structured(walkers.to_structured())
+        assert isinstance(rebuilt, ExportedWalkers)
+        assert len(rebuilt) == len(walkers)
+        for name in walkers.keys():
+            assert rebuilt[name].dtype == walkers[name].dtype
+            assert (rebuilt[name] == walkers[name]).all(), name
+
     @pytest.mark.parametrize("states_class", state_classes)
     def test_get_params_dir(self, states_class):
         state_dict = {"name_1": {"size": tuple([1]), "dtype": numpy.float32}}
@@ -106,6 +197,17 @@ class TestStates:
             for ki, _ in v.items():
                 assert isinstance(ki, str)
 
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_state_dict_is_reusable(self, states_class):
+        state_dict = {"name_1": {"size": tuple([3]), "dtype": numpy.float32}}
+        for batch_size in (2, 5):
+            new_states = states_class(state_dict=state_dict, batch_size=batch_size)
+            assert new_states.name_1.shape == (batch_size, 3)
+        assert state_dict == {"name_1": {"size": tuple([3]), "dtype": numpy.float32}}
+        data = numpy.ones((5, 3))
+        new_states = states_class(state_dict=state_dict, batch_size=5, name_1=data)
+        assert (new_states.name_1 == data).all()
+
     @pytest.mark.parametrize("states_class", state_classes)
     def test_clone(self, states_class):
         batch_size = 10
@@ -122,6 +224,56 @@ class TestStates:
 
         assert numpy.all(target_1 == states.miau), (target_1 - states.miau, states_class)
 
+    def test_clone_data(self):
+        batch_size = 10
+        vector = numpy.arange(batch_size, dtype=numpy.float32)
+        matrix = numpy.arange(batch_size * 6).reshape(batch_size, 2, 3)
+        names = numpy.array([str(i) for i in range(batch_size)])
+        half = numpy.arange(batch_size, dtype=numpy.float16)
+        swapped = numpy.arange(batch_size, dtype=numpy.dtype(numpy.float32).newbyteorder())
+        states = States(
+            batch_size=batch_size,
+            vector=vector,
+            matrix=matrix,
+            names=names,
+            half=half,
+            swapped=swapped,
+        )
+        will_clone = numpy.zeros(batch_size, dtype=numpy.bool_)
+        will_clone[3:6] = True
+        compas_ix = numpy.arange(batch_size)[::-1]
+        compas_ix[3] = 4  # Clone to a walker that also clones
+
+        states.clone(will_clone=will_clone, compas_ix=compas_ix)
+        targets = {
+            "vector": vector,
+            "matrix": matrix,
+            "names": names,
+            "half": half,
+            "swapped": swapped,
+        }
+        for name, target in targets.items():
+            target = target.copy()
+            target[will_clone] = target[compas_ix][will_clone]
+            assert states[name].dtype == target.dtype
+            assert (states[name] == target).all(), (name, states[name], target)
+
+    @pytest.mark.parametrize("n_walkers", [0, 1, 63, 64, 65, 1000, 10000])
+    @pytest.mark.parametrize("clone_rate", [0.0, 0.1, 0.5, 1.0])
+    def test_clone_indexes(self, n_walkers, clone_rate):
+        will_clone = numpy.random.default_rng(160290).random(n_walkers) < clone_rate
+        target = numpy.flatnonzero(will_clone)
+        assert (_set_bits_indexes(_clone_iter_bits(will_clone)) == target).all()
+        assert (_clone_indexes(will_clone) == target).all()
+
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_clone_empty(self, states_class):
+        states = states_class(batch_size=0, data=numpy.zeros((0, 3)), ids=numpy.zeros(0))
+        will_clone = numpy.zeros(0, dtype=numpy.bool_)
+        states.clone(will_clone=will_clone, compas_ix=numpy.zeros(0, dtype=int))
+        assert states.data.shape == (0, 3)
+        assert set(states._walkers_rows()) >= {"data", "ids"}
+
     @pytest.mark.parametrize("states_class", state_classes)
     def test_merge_states(self, states_class):
         batch_size = 21
@@ -139,6 +291,19 @@ class TestStates:
         assert merged.test == "test"
         assert (merged.data == data).all()
 
+    @pytest.mark.parametrize("states_class", state_classes)
+    def test_merge_states_promotes_dtypes(self, states_class):
+        states = (
+            states_class(batch_size=1, x=numpy.array([1]), name=numpy.array(["a"])),
+            states_class(batch_size=2, x=numpy.array([1.5, 2.5]), name=numpy.array(["ab", "c"])),
+            states_class(batch_size=1, x=numpy.array([3]), name=numpy.array(["abcdef"])),
+        )
+        merged = states[0].merge_states(states)
+        assert merged.x.dtype == numpy.float64
+        assert (merged.x == numpy.array([1, 1.5, 2.5, 3])).all()
+        assert merged.name.dtype == numpy.dtype("<U6")
+        assert (merged.name == numpy.array(["a", "ab", "c", "abcdef"])).all()
+
     def test_merge_states_with_atari(self):
         swarm = create_atari_swarm()
         for states in (swarm.walkers.states, swarm.walkers.env_states, swarm.walkers.model_states):
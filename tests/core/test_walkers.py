@@ -73,6 +73,21 @@ class TestStatesWalkers:
             assert states_walkers[name] is not None, name
             assert len(states_walkers[name]) == states_walkers.n, name
 
+    def test_reset_uses_params_dtype(self):
+        class DoubleStatesWalkers(StatesWalkers):
+            def get_params_dict(self):
+                params = super(DoubleStatesWalkers, self).get_params_dict()
+                params["cum_rewards"] = {"dtype": numpy.float64}
+                return params
+
+        states_walkers = DoubleStatesWalkers(10)
+        cum_rewards = states_walkers.cum_rewards
+        cum_rewards[:] = 5
+        states_walkers.reset()
+        assert states_walkers.cum_rewards is cum_rewards
+        assert states_walkers.cum_rewards.dtype == numpy.float64
+        assert (states_walkers.cum_rewards == 0).all()
+
     def test_update(self, states_walkers):
         states_walkers = StatesWalkers(10)
         states_walkers.reset()
@@ -191,6 +206,21 @@ class TestWalkers:
         walkers._accumulate_and_update_rewards(rewards)
         assert (walkers.states.cum_rewards == rewards + 1).all()
 
+    def test_distance_function_gets_observs(self):
+        received = []
+
+        def hamming(x, y):
+            received.append(x)
+            return (x != y).sum(axis=1).astype(numpy.float32)
+
+        walkers = get_function_walkers()
+        walkers.distance_function = hamming
+        observs = 2 ** 40 + numpy.arange(walkers.n * 3, dtype=numpy.int64).reshape(-1, 3)
+        walkers.env_states.observs = observs
+        walkers.calculate_distances()
+        assert received[0].dtype == numpy.int64
+        assert (received[0] == observs).all()
+
     @given(observs=arrays(numpy.float32, shape=(N_WALKERS, 64, 64, 3)))
     def test_distances_not_crashes(self, walkers, observs):
         with numpy.errstate(**NUMPY_IGNORE_WARNINGS_PARAMS):
@@ -1,8 +1,14 @@
+import random
 import sys
 
+import numpy
 import pytest
 
-from fragile.distributed.distributed_export import BestWalker, DistributedExport
+from fragile.distributed.distributed_export import (
+    _ExchangeScheduler,
+    BestWalker,
+    DistributedExport,
+)
 from tests.distributed.ray import init_ray, ray
 
 
@@ -73,3 +79,56 @@ class TestExportInterface:
         assert reward > target_score, "Iters: {}, rewards: {}".format(
             swarm.walkers.epoch, swarm.walkers.states.cum_rewards
         )
+
+
+class TestDistributedExportParams:
+    @pytest.mark.parametrize("steps_per_rpc", [0, -1])
+    def test_steps_per_rpc_must_be_positive(self, steps_per_rpc):
+        with pytest.raises(ValueError):
+            DistributedExport(create_cartpole_swarm, n_swarms=2, steps_per_rpc=steps_per_rpc)
+
+
+class FakeExportSwarm:
+    """Record the iterations requested in each exchange step."""
+
+    def __init__(self):
+        self.calls = []
+        self.run_exchange_step = self
+
+    def remote(self, import_walkers, n_steps):
+        self.calls.append(n_steps)
+        return object()
+
+
+def run_scheduler(n_swarms, max_epochs, steps_per_rpc, report_interval=numpy.inf):
+    swarms = [FakeExportSwarm() for _ in range(n_swarms)]
+    scheduler = _ExchangeScheduler(swarms, max_epochs, steps_per_rpc)
+    for swarm_ix in range(n_swarms):
+        scheduler.submit(swarm_ix, None)
+    rng = random.Random(160290)
+    reported_epochs = []
+    while scheduler.pending:
+        step = rng.choice(list(scheduler.pending))
+        last_epoch = scheduler.epoch
+        scheduler.submit(scheduler.finish(step), None)
+        if scheduler.report_due(last_epoch, report_interval):
+            reported_epochs.append(scheduler.epoch)
+    return swarms, scheduler, reported_epochs
+
+
+class TestExchangeScheduler:
+    @pytest.mark.parametrize("max_epochs, steps_per_rpc", [(10, 1), (10, 3), (10, 5), (4, 16)])
+    def test_swarms_run_max_epochs(self, max_epochs, steps_per_rpc):
+        swarms, scheduler, _ = run_scheduler(3, max_epochs, steps_per_rpc)
+        n_full, last_steps = divmod(max_epochs, steps_per_rpc)
+        expected_calls = [steps_per_rpc] * n_full + ([last_steps] if last_steps else [])
+        for swarm in swarms:
+            assert swarm.calls == expected_calls
+        assert scheduler.pending == {}
+        assert scheduler.epoch == max_epochs
+
+    def test_report_interval(self):
+        _, _, reported_epochs = run_scheduler(1, 20, 3, report_interval=5)
+        assert reported_epochs == [6, 12, 15, 20]
+        _, _, reported_epochs = run_scheduler(2, 20, 3)
+        assert reported_epochs == []
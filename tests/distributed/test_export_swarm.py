@@ -162,6 +162,14 @@ class TestExportedSwarm:
         assert len(exported) == export_swarm.n_export
         assert export_swarm.best_reward == 999
 
+    def test_run_exchange_step_n_steps(self, export_swarm):
+        export_swarm.reset()
+        n_steps = []
+        export_swarm.run_step = lambda: n_steps.append(1)
+        exported = export_swarm.run_exchange_step(ExportedWalkers(0), n_steps=3)
+        assert len(exported) == export_swarm.n_export
+        assert len(n_steps) == 3
+
 
 def create_export_swarm():
     swarm = create_cartpole_swarm()